@@ -1,7 +1,15 @@
 # Імпортуємо необхідні бібліотеки
+import asyncio
+import functools
 import logging
-from zeep import Client
+from collections import OrderedDict, defaultdict
+from decimal import Decimal
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+import httpx
+from zeep import AsyncClient
+from zeep.cache import SqliteCache
 from zeep.exceptions import Fault, ValidationError, TransportError
+from zeep.transports import AsyncTransport
 
 # Налаштування логування
 # Рівень INFO, формат: Час - Назва логера - Рівень - Повідомлення
@@ -15,20 +23,60 @@ logger = logging.getLogger("TemperatureWSClient")
 # URL WSDL вебсервісу
 WSDL_URL = 'https://webservices.daehosting.com/services/TemperatureConversions.wso?wsdl'
 
+# Функції з кешем результатів (очищуються разом із клієнтом у close_client)
+_CACHED_SOAP_CALLS = []
 
-def create_client(wsdl_url=WSDL_URL):
+# Вже створені клієнти за WSDL URL (прибираються з кешу в close_client)
+_CLIENTS: Dict[str, AsyncClient] = {}
+
+
+async def _build_client(wsdl_url):
+    """
+    Будує SOAP клієнт для WSDL URL. Якщо WSDL не вдалося завантажити,
+    закриває обидва HTTP-клієнти транспорту та передає виняток далі.
+
+    Клієнт асинхронний: використовує спільний httpx.AsyncClient з HTTP/2 (конкурентні
+    запити мультиплексуються в одному TLS-з'єднанні; потрібен пакет h2, тобто httpx[http2])
+    та дисковий кеш WSDL/XSD, тож повторні виклики не розбирають схему заново.
+
+    Args:
+        wsdl_url (str): URL WSDL-файлу вебсервісу.
+
+    Returns:
+        zeep.AsyncClient: Об'єкт асинхронного SOAP клієнта.
+    """
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10)
+    )
+    transport = AsyncTransport(client=http_client, cache=SqliteCache())
+    try:
+        return AsyncClient(wsdl=wsdl_url, transport=transport)
+    except Exception:
+        # WSDL читається синхронним wsdl_client транспорту, тож закриваємо обидва клієнти
+        transport.wsdl_client.close()
+        await http_client.aclose()
+        raise
+
+
+async def create_client(wsdl_url=WSDL_URL):
     """
     Створює та повертає SOAP клієнт для вказаного WSDL URL.
+    Повторні виклики з тим самим URL повертають вже створений клієнт.
 
     Args:
         wsdl_url (str): URL WSDL-файлу вебсервісу.
 
     Returns:
-        zeep.Client | None: Об'єкт SOAP клієнта або None у разі помилки.
+        zeep.AsyncClient | None: Об'єкт SOAP клієнта або None у разі помилки.
     """
+    client = _CLIENTS.get(wsdl_url)
+    if client is not None:
+        return client
     try:
-        # Спроба створити клієнт
-        client = Client(wsdl=wsdl_url)
+        # Спроба створити клієнт (невдалі спроби не кешуються, бо викликають виняток)
+        client = await _build_client(wsdl_url)
+        _CLIENTS[wsdl_url] = client
         logger.info(f"SOAP client created successfully for {wsdl_url}")
         return client
     except Exception as e:
@@ -37,183 +85,349 @@ def create_client(wsdl_url=WSDL_URL):
         return None
 
 
-def safe_soap_call(operation_name, service_method, *args, **kwargs): # Додано operation_name
+async def close_client(client):
     """
-    Безпечно викликає метод SOAP сервісу з обробкою типових помилок.
+    Закриває обидва HTTP-клієнти транспорту (асинхронний для викликів і синхронний
+    для WSDL), прибирає клієнт з кешу клієнтів та скидає кеші результатів.
+
+    Args:
+        client (zeep.AsyncClient): Клієнт, створений через create_client.
+    """
+    await client.transport.aclose() # AsyncTransport.aclose закриває лише асинхронний клієнт
+    client.transport.wsdl_client.close()
+    for wsdl_url in [url for url, cached in _CLIENTS.items() if cached is client]:
+        del _CLIENTS[wsdl_url]
+    for cached_call in _CACHED_SOAP_CALLS:
+        cached_call.cache_clear()
+
+
+def cache_soap_results(maxsize=1024):
+    """
+    Декоратор LRU-кешу для асинхронних SOAP-викликів із числовими аргументами.
+
+    functools.lru_cache не підходить для корутин (він кешував би одноразовий
+    об'єкт корутини), тому кешуються вже отримані результати.
+    Невдалі виклики (None) не кешуються, щоб їх можна було повторити.
+
+    Args:
+        maxsize (int): Максимальна кількість збережених результатів.
+
+    Returns:
+        callable: Декоратор для асинхронної функції.
+    """
+    def decorator(func):
+        cache = OrderedDict()
+
+        @functools.wraps(func)
+        async def wrapper(*args):
+            if args in cache:
+                cache.move_to_end(args)
+                return cache[args]
+            result = await func(*args)
+            if result is not None:
+                cache[args] = result
+                if len(cache) > maxsize:
+                    cache.popitem(last=False) # Видаляємо найдавніше використаний запис
+            return result
+
+        wrapper.cache_clear = cache.clear
+        _CACHED_SOAP_CALLS.append(wrapper)
+        return wrapper
+    return decorator
+
+
+def soap_op(operation_name):
+    """
+    Декоратор для безпечного виклику операції SOAP сервісу з обробкою типових помилок.
+
+    Обгортка створюється один раз під час імпорту, а декорована функція
+    звертається до client.service.<Операція> напряму.
 
     Args:
         operation_name (str): Назва операції для логування.
-        service_method (callable): Метод сервісу zeep для виклику.
-        *args: Позиційні аргументи для методу сервісу.
-        **kwargs: Іменовані аргументи для методу сервісу.
 
     Returns:
-        Any | None: Результат виклику методу сервісу або None у разі помилки.
+        callable: Декоратор для асинхронної функції виду fn(client, *args).
+        Декорована функція повертає результат операції або None у разі помилки.
     """
-    try:
-        # Виклик переданого методу сервісу
-        logger.info(f"Calling SOAP operation: {operation_name}") # Використовуємо operation_name
-        response = service_method(*args, **kwargs)
-        logger.info(f"SOAP call successful: {operation_name}")
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(client, *args, **kwargs):
+            try:
+                # Виклик операції сервісу
+                logger.info(f"Calling SOAP operation: {operation_name}")
+                response = await func(client, *args, **kwargs)
+                logger.info(f"SOAP call successful: {operation_name}")
+                return response
+            except Fault as e:
+                # Обробка помилок SOAP Fault (помилки на стороні сервера)
+                logger.error(f"SOAP Fault during {operation_name}: {e.message}", exc_info=False)
+            except ValidationError as e:
+                # Обробка помилок валідації даних (невідповідність типів)
+                logger.error(f"Validation error during {operation_name}: {e}", exc_info=True)
+            except TransportError as e:
+                # Обробка помилок транспортного рівня (проблеми з мережею, URL)
+                logger.error(f"Transport error during {operation_name}: {e}", exc_info=True)
+            except Exception as e:
+                # Обробка інших неочікуваних помилок
+                logger.error(f"Unexpected error during {operation_name}: {e}", exc_info=True)
+            return None
+        return wrapper
+    return decorator
+
+
+def _as_number(response):
+    """
+    Повертає числову відповідь сервісу без зайвої конвертації.
+    xs:decimal zeep повертає як Decimal - його не перетворюємо у float, щоб не втратити точність.
+    """
+    if response is None or isinstance(response, (int, float, Decimal)):
         return response
-    except Fault as e:
-        # Обробка помилок SOAP Fault (помилки на стороні сервера)
-        logger.error(f"SOAP Fault during {operation_name}: {e.message}", exc_info=False)
-    except ValidationError as e:
-        # Обробка помилок валідації даних (невідповідність типів)
-        logger.error(f"Validation error during {operation_name}: {e}", exc_info=True)
-    except TransportError as e:
-        # Обробка помилок транспортного рівня (проблеми з мережею, URL)
-        logger.error(f"Transport error during {operation_name}: {e}", exc_info=True)
-    except Exception as e:
-        # Обробка інших неочікуваних помилок
-        logger.error(f"Unexpected error during {operation_name}: {e}", exc_info=True)
-    return None
+    return float(response)
+
+
+# --- Кешовані SOAP-виклики (ключ: клієнт та числові вхідні значення) ---
+@cache_soap_results(maxsize=1024)
+@soap_op("CelsiusToFahrenheit")
+async def _c2f(client, n_celsius):
+    return await client.service.CelsiusToFahrenheit(nCelsius=n_celsius)
+
+
+@cache_soap_results(maxsize=1024)
+@soap_op("FahrenheitToCelsius")
+async def _f2c(client, n_fahrenheit):
+    return await client.service.FahrenheitToCelsius(nFahrenheit=n_fahrenheit)
+
 
+@cache_soap_results(maxsize=1024)
+@soap_op("WindChillInCelsius")
+async def _wind_chill_c(client, n_celsius, n_wind_speed):
+    return await client.service.WindChillInCelsius(nCelsius=n_celsius, nWindSpeed=n_wind_speed)
 
-def convert_celsius_to_fahrenheit(client, celsius_temp):
+
+@cache_soap_results(maxsize=1024)
+@soap_op("WindChillInFahrenheit")
+async def _wind_chill_f(client, n_fahrenheit, n_wind_speed):
+    return await client.service.WindChillInFahrenheit(nFahrenheit=n_fahrenheit, nWindSpeed=n_wind_speed)
+
+
+async def convert_celsius_to_fahrenheit(client, celsius_temp):
     """
     Конвертує температуру з Цельсія у Фаренгейт за допомогою вебсервісу.
 
     Args:
-        client (zeep.Client): Ініціалізований SOAP клієнт.
+        client (zeep.AsyncClient): Ініціалізований SOAP клієнт.
         celsius_temp (any): Температура в градусах Цельсія (може бути числом або рядком).
 
     Returns:
-        float | None: Температура у Фаренгейтах або None у разі помилки.
+        float | Decimal | None: Температура у Фаренгейтах або None у разі помилки.
     """
     operation_name = "CelsiusToFahrenheit" # Визначаємо назву операції
     try:
         # Конвертація вхідного значення у float
         n_celsius = float(celsius_temp)
-        # Безпечний виклик методу сервісу, передаємо назву операції
-        response = safe_soap_call(operation_name, client.service.CelsiusToFahrenheit, nCelsius=n_celsius)
-        # Повернення результату як float, якщо виклик успішний
-        return float(response) if response is not None else None
+        # Безпечний виклик методу сервісу (повторні значення беруться з кешу)
+        response = await _c2f(client, n_celsius)
+        # Повернення числового результату, якщо виклик успішний
+        return _as_number(response)
     except ValueError:
         # Обробка помилки, якщо вхідне значення не можна конвертувати у float
         logger.error(f"Invalid input for {operation_name}: '{celsius_temp}'. Must be a number.")
         return None
 
 
-def convert_fahrenheit_to_celsius(client, fahrenheit_temp):
+async def convert_fahrenheit_to_celsius(client, fahrenheit_temp):
     """
     Конвертує температуру з Фаренгейта у Цельсій за допомогою вебсервісу.
 
     Args:
-        client (zeep.Client): Ініціалізований SOAP клієнт.
+        client (zeep.AsyncClient): Ініціалізований SOAP клієнт.
         fahrenheit_temp (any): Температура в градусах Фаренгейта.
 
     Returns:
-        float | None: Температура у Цельсіях або None у разі помилки.
+        float | Decimal | None: Температура у Цельсіях або None у разі помилки.
     """
     operation_name = "FahrenheitToCelsius"
     try:
         n_fahrenheit = float(fahrenheit_temp)
-        response = safe_soap_call(operation_name, client.service.FahrenheitToCelsius, nFahrenheit=n_fahrenheit)
-        return float(response) if response is not None else None
+        response = await _f2c(client, n_fahrenheit)
+        return _as_number(response)
     except ValueError:
         logger.error(f"Invalid input for {operation_name}: '{fahrenheit_temp}'. Must be a number.")
         return None
 
 
-def calculate_wind_chill_celsius(client, celsius_temp, wind_speed):
+async def calculate_wind_chill_celsius(client, celsius_temp, wind_speed):
     """
     Розраховує температуру охолодження вітром у Цельсіях.
 
     Args:
-        client (zeep.Client): Ініціалізований SOAP клієнт.
+        client (zeep.AsyncClient): Ініціалізований SOAP клієнт.
         celsius_temp (any): Температура в градусах Цельсія.
         wind_speed (any): Швидкість вітру (в км/год, як очікує сервіс).
 
     Returns:
-        float | None: Розрахована температура охолодження вітром або None у разі помилки.
+        float | Decimal | None: Розрахована температура охолодження вітром або None у разі помилки.
     """
     operation_name = "WindChillInCelsius"
     try:
         n_celsius = float(celsius_temp)
         n_wind_speed = float(wind_speed)
-        response = safe_soap_call(
-            operation_name,
-            client.service.WindChillInCelsius,
-            nCelsius=n_celsius,
-            nWindSpeed=n_wind_speed
-        )
-        return float(response) if response is not None else None
+        response = await _wind_chill_c(client, n_celsius, n_wind_speed)
+        return _as_number(response)
     except ValueError:
         logger.error(f"Invalid numeric input for {operation_name}: celsius='{celsius_temp}', wind_speed='{wind_speed}'")
         return None
 
 
-def calculate_wind_chill_fahrenheit(client, fahrenheit_temp, wind_speed):
+async def calculate_wind_chill_fahrenheit(client, fahrenheit_temp, wind_speed):
     """
     Розраховує температуру охолодження вітром у Фаренгейтах.
 
     Args:
-        client (zeep.Client): Ініціалізований SOAP клієнт.
+        client (zeep.AsyncClient): Ініціалізований SOAP клієнт.
         fahrenheit_temp (any): Температура в градусах Фаренгейта.
         wind_speed (any): Швидкість вітру (в милях/год, як очікує сервіс).
 
     Returns:
-        float | None: Розрахована температура охолодження вітром або None у разі помилки.
+        float | Decimal | None: Розрахована температура охолодження вітром або None у разі помилки.
     """
     operation_name = "WindChillInFahrenheit"
     try:
         n_fahrenheit = float(fahrenheit_temp)
         n_wind_speed = float(wind_speed)
-        response = safe_soap_call(
-            operation_name,
-            client.service.WindChillInFahrenheit,
-            nFahrenheit=n_fahrenheit,
-            nWindSpeed=n_wind_speed
-        )
-        return float(response) if response is not None else None
+        response = await _wind_chill_f(client, n_fahrenheit, n_wind_speed)
+        return _as_number(response)
     except ValueError:
         logger.error(f"Invalid numeric input for {operation_name}: fahrenheit='{fahrenheit_temp}', wind_speed='{wind_speed}'")
         return None
 
 
-def run_demo():
+# --- Конвеєр залежних операцій ---
+class Ref(NamedTuple):
+    """Посилання на результат попереднього кроку конвеєра за його індексом."""
+    step_index: int
+
+
+class Step(NamedTuple):
+    """Крок конвеєра: асинхронна операція (напр. convert_*) та її аргументи (значення або Ref)."""
+    operation: Callable
+    args: Tuple[Any, ...] = ()
+
+
+async def pipeline(client, steps):
+    """
+    Виконує кроки з залежностями шарами: кроки одного шару не залежать один від одного
+    і запускаються конкурентно через asyncio.gather, тож ланцюжок з N незалежних
+    гілок коштує стільки round-trip, скільки шарів у найдовшій гілці.
+
+    Args:
+        client (zeep.AsyncClient): Ініціалізований SOAP клієнт.
+        steps (list[Step]): Кроки; Ref(i) у args підставляє результат кроку i (i < поточного).
+
+    Returns:
+        list: Результати кроків у тому ж порядку (None, якщо крок або його залежність не вдалися).
+    """
+    # Номер шару кроку = 1 + найбільший шар серед його залежностей (топологічний порядок)
+    layers = defaultdict(list)
+    step_layers = []
+    for index, step in enumerate(steps):
+        layer = 0
+        for arg in step.args:
+            if isinstance(arg, Ref):
+                if not 0 <= arg.step_index < index:
+                    raise ValueError(f"Step #{index} references step #{arg.step_index}, which does not precede it")
+                layer = max(layer, step_layers[arg.step_index] + 1)
+        step_layers.append(layer)
+        layers[layer].append(index)
+
+    results = [None] * len(steps)
+    for layer in sorted(layers):
+        pending = {}
+        for index in layers[layer]:
+            step = steps[index]
+            args = [results[arg.step_index] if isinstance(arg, Ref) else arg for arg in step.args]
+            if any(isinstance(arg, Ref) and results[arg.step_index] is None for arg in step.args):
+                logger.warning(f"Skipping pipeline step #{index} ({step.operation.__name__}): a dependency failed")
+                continue
+            pending[index] = step.operation(client, *args)
+        layer_results = await asyncio.gather(*pending.values(), return_exceptions=True)
+        for index, result in zip(pending, layer_results):
+            if isinstance(result, Exception):
+                logger.error(f"Pipeline step #{index} failed: {result}")
+                result = None
+            results[index] = result
+    return results
+
+
+async def run_demo():
     """
     Запускає демонстраційні виклики всіх операцій вебсервісу.
+    Усі незалежні виклики виконуються конкурентно через asyncio.gather,
+    тому загальний час близький до одного round-trip, а не до суми всіх.
     """
-    client = create_client()
+    client = await create_client()
     if client is None:
         print("SOAP client initialization failed. Cannot run demo.")
         return
 
-    print("\n--- Testing CelsiusToFahrenheit ---")
-    for celsius_value in [0, 100, -40]:
-        result = convert_celsius_to_fahrenheit(client, celsius_value)
-        if result is not None:
-            print(f"Input: {celsius_value}°C -> Output: {result:.2f}°F")
-
-    print("\n--- Testing FahrenheitToCelsius ---")
-    for fahrenheit_value in [32, 212, -40]:
-        result = convert_fahrenheit_to_celsius(client, fahrenheit_value)
-        if result is not None:
-            print(f"Input: {fahrenheit_value}°F -> Output: {result:.2f}°C")
-
-    print("\n--- Testing WindChillInCelsius ---")
+    celsius_values = [0, 100, -40]
+    fahrenheit_values = [32, 212, -40]
     test_cases_celsius = [(5, 20), (-10, 30), (0, 5)]
-    for temp, speed in test_cases_celsius:
-        result = calculate_wind_chill_celsius(client, temp, speed)
-        if result is not None:
-            print(f"Input: Temp={temp}°C, Wind={speed} km/h -> Output: {result:.2f}°C")
-
-    print("\n--- Testing WindChillInFahrenheit ---")
     test_cases_fahrenheit = [(41, 15), (14, 25), (32, 5)] # 41F=5C, 14F=-10C, 32F=0C
-    for temp, speed in test_cases_fahrenheit:
-        result = calculate_wind_chill_fahrenheit(client, temp, speed)
-        if result is not None:
-            print(f"Input: Temp={temp}°F, Wind={speed} mph -> Output: {result:.2f}°F")
 
-    print("\n--- Testing Error Handling (Invalid Input Type) ---")
-    # Спроба передати нечислове значення
-    convert_celsius_to_fahrenheit(client, "invalid_temperature")
+    try:
+        tasks = (
+            [convert_celsius_to_fahrenheit(client, v) for v in celsius_values]
+            + [convert_fahrenheit_to_celsius(client, v) for v in fahrenheit_values]
+            + [calculate_wind_chill_celsius(client, t, s) for t, s in test_cases_celsius]
+            + [calculate_wind_chill_fahrenheit(client, t, s) for t, s in test_cases_fahrenheit]
+        )
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for index, result in enumerate(results):
+            if isinstance(result, Exception):
+                # Непередбачена помилка в одному з викликів не зупиняє решту демо
+                logger.error(f"Demo call #{index} failed: {result}")
+                results[index] = None
+        c2f, f2c, wc_c, wc_f = (results[i:i + 3] for i in range(0, len(results), 3))
+
+        print("\n--- Testing CelsiusToFahrenheit ---")
+        for celsius_value, result in zip(celsius_values, c2f):
+            if result is not None:
+                print(f"Input: {celsius_value}°C -> Output: {result:.2f}°F")
+
+        print("\n--- Testing FahrenheitToCelsius ---")
+        for fahrenheit_value, result in zip(fahrenheit_values, f2c):
+            if result is not None:
+                print(f"Input: {fahrenheit_value}°F -> Output: {result:.2f}°C")
+
+        print("\n--- Testing WindChillInCelsius ---")
+        for (temp, speed), result in zip(test_cases_celsius, wc_c):
+            if result is not None:
+                print(f"Input: Temp={temp}°C, Wind={speed} km/h -> Output: {result:.2f}°C")
+
+        print("\n--- Testing WindChillInFahrenheit ---")
+        for (temp, speed), result in zip(test_cases_fahrenheit, wc_f):
+            if result is not None:
+                print(f"Input: Temp={temp}°F, Wind={speed} mph -> Output: {result:.2f}°F")
+
+        print("\n--- Testing Pipeline (F -> C -> WindChillInCelsius -> F) ---")
+        chain = [
+            Step(convert_fahrenheit_to_celsius, (41,)),
+            Step(calculate_wind_chill_celsius, (Ref(0), 20)),
+            Step(convert_celsius_to_fahrenheit, (Ref(1),)),
+        ]
+        to_celsius, wind_chill, back_to_fahrenheit = await pipeline(client, chain)
+        if back_to_fahrenheit is not None:
+            print(f"Input: 41°F -> {to_celsius:.2f}°C -> Wind=20 km/h -> {wind_chill:.2f}°C -> Output: {back_to_fahrenheit:.2f}°F")
+
+        print("\n--- Testing Error Handling (Invalid Input Type) ---")
+        # Спроба передати нечислове значення
+        await convert_celsius_to_fahrenheit(client, "invalid_temperature")
+    finally:
+        await close_client(client)
 
 if __name__ == "__main__":
     logger.info("--- Starting TemperatureConversions web service client demo ---")
-    run_demo()
+    asyncio.run(run_demo())
     logger.info("--- Demo finished ---")
-
@@ -1,31 +1,51 @@
 #(Консольний клієнт для ЛР3)
+import atexit
+import sys
 import requests
 import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 # Базовий URL API 
 BASE_URL = "http://127.0.0.1:8000"
 
+# Єдина HTTP-сесія для всіх запитів: keep-alive та пул TCP-з'єднань
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
+SESSION.headers["Connection"] = "keep-alive"
+atexit.register(SESSION.close)
+
+def _json(response):
+    """Розбирає тіло відповіді через orjson (швидше за stdlib json у response.json()).
+    orjson.JSONDecodeError є підкласом json.JSONDecodeError, тож обробка помилок не змінюється."""
+    return orjson.loads(response.content)
+
 def print_product(product):
-    """Допоміжна функція для гарного виводу інформації про продукт."""
-    print("-" * 20)
-    print(f"ID: {product.get('id')}")
-    print(f"Name: {product.get('name')}")
-    print(f"Category: {product.get('category')}")
-    print(f"Price: {product.get('price'):.2f} UAH")
-    print(f"In stock: {product.get('stock')} pcs.")
-    print("-" * 20)
+    """Допоміжна функція для гарного виводу інформації про продукт (одним записом у stdout)."""
+    separator = "-" * 20
+    sys.stdout.write(
+        f"{separator}\n"
+        f"ID: {product.get('id')}\n"
+        f"Name: {product.get('name')}\n"
+        f"Category: {product.get('category')}\n"
+        f"Price: {product.get('price'):.2f} UAH\n"
+        f"In stock: {product.get('stock')} pcs.\n"
+        f"{separator}\n"
+    )
 
 def get_all_products():
     """Отримує та виводить список всіх продуктів."""
     try:
-        response = requests.get(f"{BASE_URL}/products")
+        response = SESSION.get(f"{BASE_URL}/products")
         response.raise_for_status() # Перевірка на HTTP помилки (4xx, 5xx)
-        products = response.json()
+        products = _json(response)
         if not products:
             print("Product catalog is empty.")
             return
         print("\n--- Product List ---")
         for product in products:
             print_product(product)
+        sys.stdout.flush() # Один flush після виводу всього списку
     except requests.exceptions.RequestException as e:
         print(f"Network or API error: {e}")
     except json.JSONDecodeError:
@@ -35,11 +55,11 @@ def get_product_by_id():
     """Запитує ID та виводить інформацію про конкретний продукт."""
     try:
         product_id = int(input("Enter product ID: "))
-        response = requests.get(f"{BASE_URL}/products/{product_id}")
+        response = SESSION.get(f"{BASE_URL}/products/{product_id}")
         if response.status_code == 404:
             print(f"Error: Product with ID {product_id} not found.")
         elif response.status_code == 200:
-            product = response.json()
+            product = _json(response)
             print("\n--- Product Information ---")
             print_product(product)
         else:
@@ -51,6 +71,42 @@ def get_product_by_id():
     except json.JSONDecodeError:
         print("Error: Could not parse server response.")
 
+def _fetch_product(product_id):
+    """Отримує один продукт за ID; повертає None, якщо його не знайдено."""
+    response = SESSION.get(f"{BASE_URL}/products/{product_id}")
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return _json(response)
+
+def get_products_bulk(product_ids, max_workers=8):
+    """Паралельно отримує продукти за списком ID через спільну сесію.
+    Кількість потоків не перевищує pool_maxsize сесії, тож з'єднання перевикористовуються."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_fetch_product, product_ids))
+
+def get_many_products():
+    """Запитує кілька ID через кому та виводить інформацію про ці продукти."""
+    try:
+        raw_ids = input("Enter product IDs (comma-separated): ")
+        product_ids = [int(part) for part in raw_ids.split(",") if part.strip()]
+        if not product_ids:
+            print("Error: No product IDs entered.")
+            return
+        products = get_products_bulk(product_ids)
+        print("\n--- Products Information ---")
+        for product_id, product in zip(product_ids, products):
+            if product is None:
+                print(f"Error: Product with ID {product_id} not found.")
+            else:
+                print_product(product)
+    except ValueError:
+        print("Error: Product IDs must be integers.")
+    except requests.exceptions.RequestException as e:
+        print(f"Network or API error: {e}")
+    except json.JSONDecodeError:
+        print("Error: Could not parse server response.")
+
 def add_product():
     """Запитує дані та додає новий продукт."""
     print("\n--- Add New Product ---")
@@ -74,10 +130,10 @@ def add_product():
             "price": price,
             "stock": stock
         }
-        response = requests.post(f"{BASE_URL}/products", json=product_data)
+        response = SESSION.post(f"{BASE_URL}/products", json=product_data)
         response.raise_for_status()
         if response.status_code == 201:
-            new_product = response.json()
+            new_product = _json(response)
             print("\nProduct has been added successfully:")
             print_product(new_product)
         else:
@@ -94,12 +150,7 @@ def update_existing_product():
     print("\n--- Update Product ---")
     try:
         product_id = int(input("Enter product ID to update: "))
-        # Спочатку перевіримо, чи існує товар
-        get_response = requests.get(f"{BASE_URL}/products/{product_id}")
-        if get_response.status_code == 404:
-            print(f"Error: Product with ID {product_id} not found.")
-            return
-        get_response.raise_for_status()
+        # Окремий GET для перевірки не потрібен: сервер сам поверне 404 на PUT
         print("Enter new data (leave blank to keep unchanged):")
         name = input(f"New name: ")
         category = input(f"New category: ")
@@ -121,10 +172,13 @@ def update_existing_product():
         if not update_data:
             print("No data to update.")
             return
-        response = requests.put(f"{BASE_URL}/products/{product_id}", json=update_data)
+        response = SESSION.put(f"{BASE_URL}/products/{product_id}", json=update_data)
+        if response.status_code == 404:
+            print(f"Error: Product with ID {product_id} not found.")
+            return
         response.raise_for_status()
         if response.status_code == 200:
-            updated_product = response.json()
+            updated_product = _json(response)
             print("\nProduct has been updated successfully:")
             print_product(updated_product)
         else:
@@ -141,7 +195,7 @@ def delete_existing_product():
     print("\n--- Delete Product ---")
     try:
         product_id = int(input("Enter product ID to delete: "))
-        response = requests.delete(f"{BASE_URL}/products/{product_id}")
+        response = SESSION.delete(f"{BASE_URL}/products/{product_id}")
         if response.status_code == 204:
             print(f"Product with ID {product_id} was successfully deleted.")
         elif response.status_code == 404:
@@ -161,6 +215,7 @@ def print_menu():
     print("3. Add new product")
     print("4. Update product")
     print("5. Delete product")
+    print("6. Fetch products by IDs (comma-separated)")
     print("0. Exit")
     print("-" * 41)
 
@@ -179,6 +234,8 @@ if __name__ == "__main__":
             update_existing_product()
         elif choice == '5':
             delete_existing_product()
+        elif choice == '6':
+            get_many_products()
         elif choice == '0':
             print("Exiting client.")
             break
@@ -1,34 +1,110 @@
-# Сервер на FastAPI для ЛР4
+# Сервер на FastAPI для ЛР4 (Pydantic v2: валідація виконується в pydantic-core)
+from collections import defaultdict
 from fastapi import FastAPI, HTTPException, Query, status
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Any, List, Optional, Dict, Protocol, Set
 # --- Моделі даних (Pydantic) ---
 # Модель для створення продукту (без id, бо він генерується)
 class ProductCreate(BaseModel):
-    name: str = Field(..., min_length=3, example="Smartphone Alpha")
-    category: str = Field(..., example="Smartphones")
-    price: float = Field(..., gt=0, example=15999.99)
-    stock: int = Field(..., ge=0, example=50)
+    name: str = Field(..., min_length=3, examples=["Smartphone Alpha"])
+    category: str = Field(..., examples=["Smartphones"])
+    price: float = Field(..., gt=0, examples=[15999.99])
+    stock: int = Field(..., ge=0, examples=[50])
 # Модель для оновлення продукту (всі поля опціональні)
 class ProductUpdate(BaseModel):
-    name: Optional[str] = Field(None, min_length=3, example="Smartphone Alpha X")
-    category: Optional[str] = Field(None, example="Smartphones")
-    price: Optional[float] = Field(None, gt=0, example=16500.00)
-    stock: Optional[int] = Field(None, ge=0, example=45)
+    name: Optional[str] = Field(None, min_length=3, examples=["Smartphone Alpha X"])
+    category: Optional[str] = Field(None, examples=["Smartphones"])
+    price: Optional[float] = Field(None, gt=0, examples=[16500.00])
+    stock: Optional[int] = Field(None, ge=0, examples=[45])
 # Модель продукту для відповіді (включає id)
 class Product(ProductCreate):
     id: int
-# --- "In-memory" база даних ---
-# Використовуємо словник для зберігання продуктів, де ключ - це id
-products_db: Dict[int, Product] = {}
-# Лічильник для генерації наступного унікального ID
-next_product_id: int = 1
+    # Категорія в нижньому регістрі обчислюється один раз при створенні (ключ індексу категорій)
+    _category_lc: str = PrivateAttr(default="")
+
+    def model_post_init(self, __context: Any) -> None:
+        self._category_lc = self.category.lower()
+# --- Сховище продуктів ---
+# Ендпоінти працюють лише через протокол ProductStore, тож in-memory реалізацію
+# можна замінити на спільне сховище (Redis, sqlite) для запуску з кількома воркерами
+class ProductStore(Protocol):
+    def add(self, product_in: ProductCreate) -> Product: ...
+    def get(self, product_id: int) -> Optional[Product]: ...
+    def list(self, category: Optional[str] = None) -> List[Product]: ...
+    def update(self, product_id: int, update_data: Dict[str, Any]) -> Optional[Product]: ...
+    def delete(self, product_id: int) -> bool: ...
+
+class InMemoryProductStore:
+    """Сховище в пам'яті: щільний список продуктів (id = позиція + 1) та індекс за категоріями."""
+    def __init__(self):
+        # ID видаються послідовно, тому замість словника - список з індексом id - 1.
+        # Видалені продукти лишаються як None, тож ID ніколи не перевикористовуються
+        self.products: List[Optional[Product]] = []
+        # Вторинний індекс: категорія (у нижньому регістрі) -> множина id продуктів
+        self.category_index: Dict[str, Set[int]] = defaultdict(set)
+
+    def add(self, product_in: ProductCreate) -> Product:
+        # Метод синхронний (без await), тож у межах event loop видача ID атомарна
+        product_id = len(self.products) + 1
+        # Створюємо об'єкт Product з присвоєним id
+        new_product = Product(id=product_id, **product_in.model_dump())
+        self.products.append(new_product)
+        self.category_index[new_product._category_lc].add(product_id)
+        return new_product
+
+    def get(self, product_id: int) -> Optional[Product]:
+        index = product_id - 1
+        return self.products[index] if 0 <= index < len(self.products) else None
+
+    def list(self, category: Optional[str] = None) -> List[Product]:
+        if category:
+            # Беремо id продуктів категорії з індексу замість повного перебору (порядок - за id)
+            category_lc = category.lower()
+            product_ids = self.category_index.get(category_lc, ())
+            return [self.products[product_id - 1] for product_id in sorted(product_ids)]
+        return [product for product in self.products if product is not None]
+
+    def update(self, product_id: int, update_data: Dict[str, Any]) -> Optional[Product]:
+        existing_product = self.get(product_id)
+        if existing_product is None:
+            return None
+        # Зливаємо зміни одним викликом замість setattr для кожного поля
+        updated_product = existing_product.model_copy(update=update_data)
+        if update_data.get("category") is not None:
+            # model_copy не викликає model_post_init, тож оновлюємо ключ вручну
+            # і переносимо продукт у індексі до нової категорії
+            updated_product._category_lc = updated_product.category.lower()
+            self._discard_from_category_index(existing_product._category_lc, product_id)
+            self.category_index[updated_product._category_lc].add(product_id)
+        self.products[product_id - 1] = updated_product
+        return updated_product
+
+    def delete(self, product_id: int) -> bool:
+        removed_product = self.get(product_id)
+        if removed_product is None:
+            return False
+        self.products[product_id - 1] = None # Залишаємо "надгробок", щоб не зсувати ID
+        self._discard_from_category_index(removed_product._category_lc, product_id)
+        return True
+
+    def _discard_from_category_index(self, category_lc: str, product_id: int):
+        """Прибирає id продукту з індексу категорії та видаляє порожні категорії."""
+        product_ids = self.category_index.get(category_lc)
+        if product_ids is not None:
+            product_ids.discard(product_id)
+            if not product_ids:
+                del self.category_index[category_lc]
+
+store: ProductStore = InMemoryProductStore()
 # --- Ініціалізація FastAPI ---
 app = FastAPI(
     title="Electronics Shop API",
     description="REST API to manage the products catalog.",
     version="1.0.0"
 )
+# Ендпоінти повертають готові екземпляри Product зі сховища: FastAPI серіалізує їх за
+# response_model одразу в JSON-байти через pydantic-core, а перевірка вже валідних
+# екземплярів зводиться до isinstance. Власний response_class вимкнув би цей шлях.
 # --- API endpoints ---
 @app.post("/products", response_model=Product, status_code=status.HTTP_201_CREATED, tags=["Products"])
 async def create_product(product_in: ProductCreate):
@@ -36,13 +112,7 @@ async def create_product(product_in: ProductCreate):
     Створює новий товар в каталозі.
     Приймає дані товару, генерує ID, зберігає та повертає створений товар.
     """
-    global next_product_id
-    product_id = next_product_id
-    # Створюємо об'єкт Product з присвоєним id
-    new_product = Product(id=product_id, **product_in.dict())
-    products_db[product_id] = new_product
-    next_product_id += 1
-    return new_product
+    return store.add(product_in)
 
 @app.get("/products", response_model=List[Product], tags=["Products"])
 async def get_products(category: Optional[str] = Query(None, description="Filter products by category")):
@@ -50,14 +120,7 @@ async def get_products(category: Optional[str] = Query(None, description="Filter
     Повертає список всіх товарів.
     Можна опціонально фільтрувати за категорією.
     """
-    if category:
-        # Фільтруємо продукти за категорією
-        filtered_products = [
-            product for product in products_db.values() if product.category.lower() == category.lower()
-        ]
-        return filtered_products
-    # Повертаємо всі продукти, якщо категорія не вказана
-    return list(products_db.values())
+    return store.list(category)
 
 @app.get("/products/{product_id}", response_model=Product, tags=["Products"])
 async def get_product(product_id: int):
@@ -65,7 +128,7 @@ async def get_product(product_id: int):
     Повертає інформацію про конкретний товар за його ID.
     Якщо товар не знайдено, повертає помилку 404.
     """
-    product = products_db.get(product_id)
+    product = store.get(product_id)
     if product is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
     return product
@@ -77,15 +140,13 @@ async def update_product(product_id: int, product_in: ProductUpdate):
     Приймає дані для оновлення (лише ті поля, що потрібно змінити).
     Якщо товар не знайдено, повертає помилку 404.
     """
-    existing_product = products_db.get(product_id)
-    if existing_product is None:
+    # Беремо лише передані поля; явні null відкидаємо, бо model_copy не валідує,
+    # а поля Product не опціональні (інакше індекс категорій розійшовся б з даними)
+    update_data = product_in.model_dump(exclude_unset=True, exclude_none=True)
+    updated_product = store.update(product_id, update_data)
+    if updated_product is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
-    # Оновлюємо дані існуючого продукту
-    update_data = product_in.dict(exclude_unset=True) # Беремо лише передані поля
-    for key, value in update_data.items():
-        setattr(existing_product, key, value)
-    products_db[product_id] = existing_product # Зберігаємо оновлений об'єкт
-    return existing_product
+    return updated_product
 
 @app.delete("/products/{product_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Products"])
 async def delete_product(product_id: int):
@@ -94,9 +155,8 @@ async def delete_product(product_id: int):
     Якщо товар не знайдено, повертає помилку 404.
     У разі успіху повертає статус 204 No Content.
     """
-    if product_id not in products_db:
+    if not store.delete(product_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
-    del products_db[product_id]
     # Успішна відповідь DELETE не повинна мати тіла
     return None
 
@@ -105,6 +165,11 @@ async def delete_product(product_id: int):
 # uvicorn lab_4:app --reload
 # Where 'lab_4' is your filename (lab_4.py), 'app' is the FastAPI object.
 # The '--reload' flag will automatically reload the server on code changes.
+#
+# For production, run with the C-based event loop and HTTP parser (pip install uvloop httptools):
+# uvicorn lab_4:app --loop uvloop --http httptools --workers $(nproc)
+# Note: every worker is a separate process with its own InMemoryProductStore,
+# so multiple workers need a shared ProductStore implementation (e.g. Redis or sqlite).
 # API will be available at http://127.0.0.1:8000
 # Interactive documentation (Swagger UI): http://127.0.0.1:8000/docs
 # Alternative documentation (ReDoc): http://127.0.0.1:8000/redoc
\ No newline at end of file
@@ -1,17 +1,58 @@
 # etl_service.py
 
 from fastapi import FastAPI, HTTPException, status
-from pydantic import BaseModel, Field, validator
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 from typing import List, Optional, Dict, Any
-import json
+import orjson
+import functools
+import gzip
 import os
+import tempfile
 import logging
+import zlib
+
+# Налаштування логера для виводу в консоль
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
 # --- Налаштування ---
 # Шляхи до файлів джерел та цільового файлу
 SOURCE_A_PATH = "source_products_branch_A.json"
 SOURCE_B_PATH = "source_additional_info_branch_B.json"
-CONSOLIDATED_DATA_PATH = "consolidated_electronics_store.json"
+# Консолідований файл зберігається стиснутим gzip: однотипні записи продуктів стискаються в рази
+CONSOLIDATED_DATA_PATH = "consolidated_electronics_store.json.gz"
+
+# umask процесу читається один раз при імпорті (os.umask не можна лише прочитати, а
+# тимчасова зміна в потоках ETL була б гонкою); потрібна для прав консолідованого файлу
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Стандартизація категорій: назва категорії з джерела (у нижньому регістрі) -> стандартна назва
+CATEGORY_MAP = {
+    "laptops": "Ноутбуки",
+    "notebooks": "Ноутбуки",
+    "smartphones": "Смартфони",
+    "phones": "Смартфони",
+    "audio": "Аудіотехніка",
+    "headphones": "Аудіотехніка",
+    "tablets": "Планшети",
+    "wearables": "Носимі пристрої",
+}
+
+# Тестові дані джерел (записуються у файли при запуску сервера, якщо файлів немає)
+SAMPLE_DATA_A = [
+    {"id": 1, "name": "Laptop Alpha", "category": "Laptops", "price": 25000.00, "stock": 10},
+    {"id": 2, "name": "Smartphone Beta", "category": "Smartphones", "price": 12000.00, "stock": 25},
+    {"id": 3, "name": "Headphones Gamma", "category": "Audio", "price": 0, "stock": 5}, # "Погані" дані для очищення
+    {"id": 4, "name": "Tablet Delta", "category": "Tablets", "price": 8500.00, "stock": 0}, # "Погані" дані для очищення
+]
+SAMPLE_DATA_B = [
+    {"product_id": 1, "description": "High-performance laptop for professionals.", "supplier": "SupplierX", "old_price": 26000.00, "price": 24500.00}, # Оновлення існуючого
+    {"product_id": 5, "name": "Smartwatch Epsilon", "category": "Wearables", "description": "Latest generation smartwatch.", "supplier": "SupplierY", "price": 7500.00, "stock": 30}, # Новий продукт
+    {"product_id": 2, "supplier": "SupplierZ", "stock": 30} # Оновлення стоку і постачальника
+]
 
 # --- Моделі даних (Pydantic) ---
 class ProductBase(BaseModel):
@@ -43,6 +84,11 @@ class ConsolidatedProduct(ProductBase):
     supplier: Optional[str] = None
     price_change_percentage: Optional[float] = None # Додане поле
 
+# Пакетна валідація списків продуктів одним викликом pydantic-core (Pydantic v2)
+source_a_list_adapter = TypeAdapter(List[ProductSourceA])
+source_b_list_adapter = TypeAdapter(List[ProductSourceB])
+consolidated_list_adapter = TypeAdapter(List[ConsolidatedProduct])
+
 # --- Ініціалізація FastAPI ---
 app = FastAPI(
     title="ETL Service for Electronics Store",
@@ -50,55 +96,83 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# --- Функція для створення тестових даних ---
+def setup_sample_data():
+    """Створює файли джерел з тестовими даними, якщо вони не існують."""
+    for path, sample_data in ((SOURCE_A_PATH, SAMPLE_DATA_A), (SOURCE_B_PATH, SAMPLE_DATA_B)):
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(orjson.dumps(sample_data, option=orjson.OPT_INDENT_2))
+            logger.info(f"Created sample data file: {path}")
+
 # --- Логіка ETL ---
 
+@functools.lru_cache(maxsize=512)
+def normalize_category(raw: str) -> str:
+    """
+    Повертає стандартну назву категорії або вихідну, якщо її немає в CATEGORY_MAP.
+    Результат кешується, тож .lower() та пошук виконуються один раз на кожен різний рядок.
+    """
+    return CATEGORY_MAP.get(raw.lower(), raw)
+
+def validate_rows(adapter: TypeAdapter, rows: List[Dict[str, Any]], source: str) -> list:
+    """
+    Валідує список записів одним викликом TypeAdapter (цикл виконується в pydantic-core).
+    Записи з помилками визначаються за індексом у ValidationError.errors(),
+    відкидаються з попередженням, а решта валідується повторно одним викликом.
+    """
+    try:
+        return adapter.validate_python(rows)
+    except ValidationError as e:
+        errors_by_index: Dict[int, List[str]] = {}
+        for error in e.errors():
+            if not error["loc"] or not isinstance(error["loc"][0], int):
+                raise # Помилка стосується всього списку, а не окремого запису
+            errors_by_index.setdefault(error["loc"][0], []).append(error["msg"])
+        for index, messages in errors_by_index.items():
+            logger.warning("Skipping invalid product data from %s: %s. Error: %s", source, rows[index], "; ".join(messages))
+        return adapter.validate_python([row for index, row in enumerate(rows) if index not in errors_by_index])
+
+def source_rows(data: Any, source: str) -> List[Any]:
+    """Повертає записи джерела; якщо джерело не є списком (напр. JSON-об'єкт), логує попередження і повертає порожній список."""
+    if isinstance(data, list):
+        return data
+    logger.warning("Expected a list of products from %s, got %s. Source is treated as empty.", source, type(data).__name__)
+    return []
+
+def price_change_percentage(new_price: float, old_price: float) -> Optional[float]:
+    """
+    Розраховує зміну ціни у відсотках (округлену до 2 знаків).
+    Повертає None, якщо стара ціна нульова або ціна не змінилася.
+    """
+    if old_price == 0 or new_price == old_price:
+        return None
+    return round(((new_price - old_price) / old_price) * 100, 2)
+
 def extract_data() -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
-    Видобуває дані з файлів джерел.
+    Видобуває дані з файлів джерел (лише читання; тестові файли створює setup_sample_data).
     Повертає кортеж зі списками словників.
     """
     data_a = []
     data_b = []
 
-    # Створюємо файли з тестовими даними, якщо вони не існують
-    if not os.path.exists(SOURCE_A_PATH):
-        sample_data_a = [
-            {"id": 1, "name": "Laptop Alpha", "category": "Laptops", "price": 25000.00, "stock": 10},
-            {"id": 2, "name": "Smartphone Beta", "category": "Smartphones", "price": 12000.00, "stock": 25},
-            {"id": 3, "name": "Headphones Gamma", "category": "Audio", "price": 0, "stock": 5}, # "Погані" дані для очищення
-            {"id": 4, "name": "Tablet Delta", "category": "Tablets", "price": 8500.00, "stock": 0}, # "Погані" дані для очищення
-        ]
-        with open(SOURCE_A_PATH, 'w', encoding='utf-8') as f:
-            json.dump(sample_data_a, f, indent=4, ensure_ascii=False)
-        logger.info(f"Created sample data file: {SOURCE_A_PATH}")
-
-    if not os.path.exists(SOURCE_B_PATH):
-        sample_data_b = [
-            {"product_id": 1, "description": "High-performance laptop for professionals.", "supplier": "SupplierX", "old_price": 26000.00, "price": 24500.00}, # Оновлення існуючого
-            {"product_id": 5, "name": "Smartwatch Epsilon", "category": "Wearables", "description": "Latest generation smartwatch.", "supplier": "SupplierY", "price": 7500.00, "stock": 30}, # Новий продукт
-            {"product_id": 2, "supplier": "SupplierZ", "stock": 30} # Оновлення стоку і постачальника
-        ]
-        with open(SOURCE_B_PATH, 'w', encoding='utf-8') as f:
-            json.dump(sample_data_b, f, indent=4, ensure_ascii=False)
-        logger.info(f"Created sample data file: {SOURCE_B_PATH}")
-
-
     try:
-        with open(SOURCE_A_PATH, 'r', encoding='utf-8') as f:
-            data_a = json.load(f)
+        with open(SOURCE_A_PATH, 'rb') as f:
+            data_a = orjson.loads(f.read())
         logger.info(f"Data extracted successfully from {SOURCE_A_PATH}")
     except FileNotFoundError:
         logger.warning(f"Source file not found: {SOURCE_A_PATH}")
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logger.error(f"Error decoding JSON from {SOURCE_A_PATH}")
 
     try:
-        with open(SOURCE_B_PATH, 'r', encoding='utf-8') as f:
-            data_b = json.load(f)
+        with open(SOURCE_B_PATH, 'rb') as f:
+            data_b = orjson.loads(f.read())
         logger.info(f"Data extracted successfully from {SOURCE_B_PATH}")
     except FileNotFoundError:
         logger.warning(f"Source file not found: {SOURCE_B_PATH}")
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logger.error(f"Error decoding JSON from {SOURCE_B_PATH}")
 
     return data_a, data_b
@@ -107,194 +181,240 @@ def transform_data(data_a: List[Dict[str, Any]], data_b: List[Dict[str, Any]]) -
     """
     Трансформує видобуті дані.
     """
-    transformed_products: Dict[int, ConsolidatedProduct] = {} # Використовуємо словник для легкого оновлення за ID
+    # Використовуємо словник для легкого оновлення за ID; самі продукти зберігаються
+    # як звичайні словники з полями ConsolidatedProduct, а не як моделі Pydantic
+    transformed_products: Dict[int, Dict[str, Any]] = {}
+    current_max_id = 0 # Найбільший ID серед продуктів, оновлюється під час обробки джерела А
+    # Рівень логування перевіряється один раз: у циклах повідомлення INFO не форматуються, якщо вимкнені
+    log_info = logger.isEnabledFor(logging.INFO)
+
+    data_a = source_rows(data_a, "source A")
+    data_b = source_rows(data_b, "source B")
 
     # 1. Обробка даних з джерела А (очищення, початкове заповнення)
+    # Очищення: видаляємо товари з ціною або кількістю 0 ще до валідації
+    rows_a: List[Dict[str, Any]] = []
     for item_a_raw in data_a:
         try:
-            # Валідація та очищення: видаляємо товари з ціною або кількістю 0
             if item_a_raw.get("price", 0) <= 0 or item_a_raw.get("stock", 0) <= 0:
-                logger.info(f"Skipping product from source A due to zero price/stock: ID {item_a_raw.get('id')}")
+                if log_info:
+                    logger.info("Skipping product from source A due to zero price/stock: ID %s", item_a_raw.get('id'))
                 continue
-            
-            # Спроба валідувати через Pydantic модель
-            item_a = ProductSourceA(**item_a_raw)
-
-            # Стандартизація категорій (приклад)
-            if item_a.category.lower() in ["laptops", "notebooks"]:
-                item_a.category = "Ноутбуки"
-            elif item_a.category.lower() in ["smartphones", "phones"]:
-                item_a.category = "Смартфони"
-            elif item_a.category.lower() in ["audio", "headphones"]:
-                item_a.category = "Аудіотехніка"
-            elif item_a.category.lower() in ["tablets"]:
-                 item_a.category = "Планшети"
-            elif item_a.category.lower() in ["wearables"]:
-                 item_a.category = "Носимі пристрої"
-
-
-            transformed_products[item_a.id] = ConsolidatedProduct(
-                id=item_a.id,
-                name=item_a.name,
-                category=item_a.category,
-                price=item_a.price,
-                stock=item_a.stock
-            )
-        except Exception as e: # Загальний Exception для Pydantic ValidationError та інших
-            logger.warning(f"Skipping invalid product data from source A: {item_a_raw}. Error: {e}")
+        except (AttributeError, TypeError) as e: # Запис не словник або ціна/кількість не числа
+            logger.warning("Skipping invalid product data from source A: %s. Error: %s", item_a_raw, e)
+            continue
+        rows_a.append(item_a_raw)
 
+    # Валідація всіх записів А одним пакетним викликом; поля ProductSourceA
+    # збігаються з обов'язковими полями ConsolidatedProduct
+    items_a = validate_rows(source_a_list_adapter, rows_a, "source A")
+    for record in source_a_list_adapter.dump_python(items_a):
+        record["category"] = normalize_category(record["category"]) # Стандартизація категорій
+        record.update(description=None, supplier=None, price_change_percentage=None)
+        transformed_products[record["id"]] = record
+        current_max_id = max(current_max_id, record["id"])
 
-    # 2. Обробка даних з джерела B (оновлення існуючих, додавання нових)
-    current_max_id = max(transformed_products.keys()) if transformed_products else 0
 
-    for item_b_raw in data_b:
+    # 2. Обробка даних з джерела B (оновлення існуючих, додавання нових)
+    # Пакетна валідація B, далі розділення на оновлення / нові продукти
+    # за хеш-множиною id з джерела А; кожна частина обробляється без розгалуження
+    source_a_ids = set(transformed_products)
+    updates_b: List[ProductSourceB] = []
+    new_items_b: List[ProductSourceB] = []
+    for item_b in validate_rows(source_b_list_adapter, data_b, "source B"):
+        if item_b.product_id in source_a_ids:
+            updates_b.append(item_b)
+        else:
+            new_items_b.append(item_b)
+
+    # 2.1. Оновлення існуючих продуктів
+    for item_b in updates_b:
+        product_id = item_b.product_id
+        # Зміни застосовуються до копії, щоб некоректне оновлення не зіпсувало продукт з джерела А
+        existing_product = dict(transformed_products[product_id])
+        if log_info:
+            logger.info("Updating existing product ID %d with data from source B.", product_id)
+        if item_b.name: existing_product["name"] = item_b.name
+        if item_b.category: # Стандартизація категорій для оновлення
+            existing_product["category"] = normalize_category(item_b.category)
+
+        if item_b.description: existing_product["description"] = item_b.description
+        if item_b.supplier: existing_product["supplier"] = item_b.supplier
+
+        new_price_b = item_b.price if item_b.price is not None else existing_product["price"]
+        old_price_for_calc = item_b.old_price if item_b.old_price is not None else existing_product["price"]
+
+        price_change = price_change_percentage(new_price_b, old_price_for_calc) # Розрахунок зміни ціни
+        if price_change is not None:
+            existing_product["price_change_percentage"] = price_change
+
+        if item_b.price is not None: existing_product["price"] = item_b.price # Оновлюємо ціну, якщо вона вказана в B
+        if item_b.stock is not None: existing_product["stock"] = item_b.stock
+
+        # Злитий запис перевіряється до збереження: оновлення з B, що порушує схему
+        # (напр. від'ємна ціна), відкидається, а продукт з джерела А лишається без змін
         try:
-            item_b = ProductSourceB(**item_b_raw) # Валідація через Pydantic
-            product_id = item_b.product_id
-
-            if product_id in transformed_products:
-                # Оновлення існуючого продукту
-                existing_product = transformed_products[product_id]
-                logger.info(f"Updating existing product ID {product_id} with data from source B.")
-                if item_b.name: existing_product.name = item_b.name
-                if item_b.category: # Стандартизація категорій для оновлення
-                    if item_b.category.lower() in ["laptops", "notebooks"]:
-                        existing_product.category = "Ноутбуки"
-                    elif item_b.category.lower() in ["smartphones", "phones"]:
-                        existing_product.category = "Смартфони"
-                    elif item_b.category.lower() in ["audio", "headphones"]:
-                        existing_product.category = "Аудіотехніка"
-                    elif item_b.category.lower() in ["tablets"]:
-                        existing_product.category = "Планшети"
-                    elif item_b.category.lower() in ["wearables"]:
-                        existing_product.category = "Носимі пристрої"
-                    else:
-                        existing_product.category = item_b.category
-
-
-                if item_b.description: existing_product.description = item_b.description
-                if item_b.supplier: existing_product.supplier = item_b.supplier
-                
-                new_price_b = item_b.price if item_b.price is not None else existing_product.price
-                old_price_for_calc = item_b.old_price if item_b.old_price is not None else existing_product.price
-                
-                if old_price_for_calc != 0 and new_price_b != old_price_for_calc : # Розрахунок зміни ціни
-                    existing_product.price_change_percentage = round(((new_price_b - old_price_for_calc) / old_price_for_calc) * 100, 2)
-                
-                if item_b.price is not None: existing_product.price = item_b.price # Оновлюємо ціну, якщо вона вказана в B
-                if item_b.stock is not None: existing_product.stock = item_b.stock
-
-            else:
-                # Додавання нового продукту з джерела B
-                logger.info(f"Adding new product from source B with original ID {product_id}.")
-                # Потрібно перевірити, чи всі обов'язкові поля є для ConsolidatedProduct
-                if not all([item_b.name, item_b.category, item_b.price is not None, item_b.stock is not None]):
-                    logger.warning(f"Skipping new product from source B due to missing core fields: {item_b_raw}")
-                    continue
-                
-                current_max_id += 1 # Генеруємо новий ID для консолідованої бази
-                new_id = current_max_id
-                
-                category_b = item_b.category
-                # Стандартизація категорій для нових продуктів
-                if category_b.lower() in ["laptops", "notebooks"]:
-                    category_b_std = "Ноутбуки"
-                elif category_b.lower() in ["smartphones", "phones"]:
-                    category_b_std = "Смартфони"
-                elif category_b.lower() in ["audio", "headphones"]:
-                    category_b_std = "Аудіотехніка"
-                elif category_b.lower() in ["tablets"]:
-                     category_b_std = "Планшети"
-                elif category_b.lower() in ["wearables"]:
-                     category_b_std = "Носимі пристрої"
-                else:
-                    category_b_std = category_b
-
-
-                transformed_products[new_id] = ConsolidatedProduct(
-                    id=new_id, # Присвоюємо новий унікальний ID
-                    name=item_b.name,
-                    category=category_b_std,
-                    price=item_b.price,
-                    stock=item_b.stock,
-                    description=item_b.description,
-                    supplier=item_b.supplier
-                )
-        except Exception as e: # Загальний Exception для Pydantic ValidationError та інших
-            logger.warning(f"Skipping invalid product data from source B: {item_b_raw}. Error: {e}")
-
-    return [product.dict() for product in transformed_products.values()]
+            ConsolidatedProduct.model_validate(existing_product)
+        except ValidationError as e:
+            logger.warning("Skipping invalid update from source B for product ID %d: %s. Error: %s",
+                           product_id, item_b.model_dump(exclude_unset=True), "; ".join(error["msg"] for error in e.errors()))
+            continue
+        transformed_products[product_id] = existing_product
+
+    # 2.2. Додавання нових продуктів з джерела B
+    for item_b in new_items_b:
+        if log_info:
+            logger.info("Adding new product from source B with original ID %d.", item_b.product_id)
+        # Потрібно перевірити, чи всі обов'язкові поля є для ConsolidatedProduct
+        if not all([item_b.name, item_b.category, item_b.price is not None, item_b.stock is not None]):
+            logger.warning("Skipping new product from source B due to missing core fields: %s", item_b.model_dump(exclude_unset=True))
+            continue
+
+        current_max_id += 1 # Генеруємо новий ID для консолідованої бази
+        new_id = current_max_id
+
+        transformed_products[new_id] = {
+            "name": item_b.name,
+            "category": normalize_category(item_b.category), # Стандартизація категорій для нових продуктів
+            "price": item_b.price,
+            "stock": item_b.stock,
+            "id": new_id, # Присвоюємо новий унікальний ID
+            "description": item_b.description,
+            "supplier": item_b.supplier,
+            "price_change_percentage": None,
+        }
+
+    # 3. Фінальна валідація всіх консолідованих продуктів одним пакетним викликом
+    # (відкидає, напр., нові продукти з B із закороткою назвою чи неправильною ціною)
+    validated_products = validate_rows(consolidated_list_adapter, list(transformed_products.values()), "consolidated result")
+    return consolidated_list_adapter.dump_python(validated_products)
 
 
 def load_data(data: List[Dict[str, Any]]):
     """
     Завантажує трансформовані дані у цільовий файл.
+    JSON пишеться компактно (без відступів) і стискається gzip з рівнем 3 -
+    швидке стиснення, а на диск потрапляє в кілька разів менше байтів.
+    Стиснуті байти записуються одним write() в унікальний тимчасовий файл у тій самій
+    теці, який потім атомарно замінює цільовий (os.replace): читачі ніколи не бачать
+    напівзаписаного файлу, а паралельні запуски ETL не перезаписують чужий тимчасовий файл.
+    mkstemp створює файл з правами 0600, тому тимчасовому файлу виставляються звичайні
+    права нового файлу (0666 з урахуванням umask, як у open()): інакше після os.replace
+    консолідований файл був би доступний лише власнику.
+    Помилка запису логується та передається далі (OSError), щоб ETL не звітував про успіх.
     """
+    payload = gzip.compress(orjson.dumps(data), compresslevel=3)
+    target_dir = os.path.dirname(os.path.abspath(CONSOLIDATED_DATA_PATH))
+    tmp_path = None
     try:
-        with open(CONSOLIDATED_DATA_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        logger.info(f"Data loaded successfully to {CONSOLIDATED_DATA_PATH}")
-    except IOError:
-        logger.error(f"Error writing data to {CONSOLIDATED_DATA_PATH}")
+        fd, tmp_path = tempfile.mkstemp(dir=target_dir, prefix=os.path.basename(CONSOLIDATED_DATA_PATH) + ".", suffix=".tmp")
+        if hasattr(os, "fchmod"): # Лише POSIX; у Windows mkstemp не обмежує читання
+            os.fchmod(fd, 0o666 & ~_UMASK)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, CONSOLIDATED_DATA_PATH)
+    except OSError:
+        logger.error(f"Error writing data to {CONSOLIDATED_DATA_PATH}", exc_info=True)
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path) # Не залишаємо тимчасовий файл після невдалого запису
+        raise
+    logger.info(f"Data loaded successfully to {CONSOLIDATED_DATA_PATH}")
+
+def read_consolidated_data() -> List[Dict[str, Any]]:
+    """
+    Читає консолідовані дані з цільового (стиснутого gzip) файлу.
+    Файл читається одним викликом і розпаковується в пам'яті: orjson розбирає
+    UTF-8 байти напряму (SIMD), без проміжного декодування у str.
+    """
+    with open(CONSOLIDATED_DATA_PATH, 'rb') as f:
+        return orjson.loads(gzip.decompress(f.read()))
 
 # --- Ендпоінти API ---
 
-# Налаштування логера для виводу в консоль
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
-
-
 @app.post("/run-etl", status_code=status.HTTP_200_OK, summary="Run the full ETL process")
 async def run_etl_process():
     """
     Запускає повний ETL процес: Видобування, Трансформація, Завантаження.
+    Блокуючі файлові операції та обчислення виконуються у пулі потоків,
+    щоб не зупиняти event loop і не затримувати інші запити під час ETL.
     """
     logger.info("ETL process started.")
     # Етап 1: Видобування
-    data_a, data_b = extract_data()
+    data_a, data_b = await run_in_threadpool(extract_data)
     if not data_a and not data_b:
         logger.warning("No data extracted from sources. ETL process might not produce expected results.")
         # return {"message": "ETL process completed, but no data was extracted from sources."}
 
 
     # Етап 2: Трансформація
-    transformed_data = transform_data(data_a, data_b)
+    transformed_data = await run_in_threadpool(transform_data, data_a, data_b)
     logger.info(f"Data transformation completed. {len(transformed_data)} products processed.")
 
     # Етап 3: Завантаження
-    load_data(transformed_data)
+    try:
+        await run_in_threadpool(load_data, transformed_data)
+    except OSError:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error writing consolidated data.")
     logger.info("ETL process finished successfully.")
     return {"message": "ETL process completed successfully.", "consolidated_items_count": len(transformed_data)}
 
-@app.get("/consolidated-data", response_model=List[ConsolidatedProduct], summary="Get consolidated data")
-async def get_consolidated_data():
-    """
-    Повертає консолідовані дані з цільового файлу.
-    """
+async def _read_consolidated_or_raise() -> List[Dict[str, Any]]:
+    """Читає консолідований файл у пулі потоків; помилки читання перетворює на HTTPException."""
     try:
-        with open(CONSOLIDATED_DATA_PATH, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        # Валідуємо кожен об'єкт даних перед поверненням
-        validated_data = [ConsolidatedProduct(**item) for item in data]
-        return validated_data
+        return await run_in_threadpool(read_consolidated_data)
     except FileNotFoundError:
         logger.error(f"Consolidated data file not found: {CONSOLIDATED_DATA_PATH}. Run ETL first.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Consolidated data not found. Please run the ETL process first via POST /run-etl")
-    except json.JSONDecodeError:
+    except (orjson.JSONDecodeError, gzip.BadGzipFile, EOFError, zlib.error): # Пошкоджений JSON, не gzip, обрізаний чи пошкоджений стиснутий вміст
         logger.error(f"Error decoding JSON from consolidated data file: {CONSOLIDATED_DATA_PATH}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error reading consolidated data.")
+
+@app.get("/consolidated-data", response_model=None, summary="Get consolidated data")
+async def get_consolidated_data():
+    """
+    Повертає консолідовані дані з цільового файлу.
+    Файл записує лише load_data після валідації в transform_data, тому дані
+    повертаються як є, без повторної перевірки Pydantic (перевірений варіант -
+    GET /consolidated-data/validated). Список одразу кодується orjson у байти
+    відповіді, без jsonable_encoder.
+    """
+    data = await _read_consolidated_or_raise()
+    return Response(content=orjson.dumps(data), media_type="application/json")
+
+@app.get("/consolidated-data/validated", response_model=List[ConsolidatedProduct], summary="Get validated consolidated data")
+async def get_validated_consolidated_data():
+    """
+    Повертає консолідовані дані, перевірені за схемою ConsolidatedProduct
+    (контракт для зовнішніх споживачів, якщо файл міг бути змінений поза ETL).
+    """
+    data = await _read_consolidated_or_raise()
+    try:
+        # Валідуємо весь список одним пакетним викликом перед поверненням
+        return consolidated_list_adapter.validate_python(data)
     except Exception as e: # Для Pydantic ValidationError та інших помилок
         logger.error(f"Error validating consolidated data: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error validating consolidated data: {str(e)}")
 
 
+# --- Запуск сервера та налаштування даних ---
+@app.on_event("startup")
+async def startup_event():
+    """Створює тестові файли джерел один раз при запуску, щоб extract_data лише читав їх."""
+    setup_sample_data()
+
 # --- Запуск сервера (для локальної розробки) ---
 # Щоб запустити цей сервер, збережіть код у файл (наприклад, lab_5.py)
 # та виконайте в терміналі команду:
 # uvicorn lab_5:app --reload
 #
+# Для продуктивного запуску (потрібні пакети uvloop та httptools):
+# uvicorn lab_5:app --workers $(nproc) --loop uvloop --http httptools --no-access-log
+# uvloop - event loop на libuv, httptools - HTTP-парсер на C, а access-лог на кожен запит вимкнено.
+# Воркери не мають спільного стану: усі вони читають і пишуть той самий консолідований файл.
+#
 # Ендпоінти будуть доступні:
 # POST /run-etl - для запуску ETL процесу
 # GET /consolidated-data - для перегляду консолідованих даних
+# GET /consolidated-data/validated - для перегляду даних, перевірених за схемою ConsolidatedProduct
 # Документація API (Swagger UI): http://127.0.0.1:8000/docs
 # Альтернативна документація (ReDoc): http://127.0.0.1:8000/redoc
\ No newline at end of file
@@ -1,9 +1,9 @@
 # federation_service.py
 
-import json
+import orjson
 import os
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple
 from fastapi import FastAPI, HTTPException, status
 from pydantic import BaseModel
 
@@ -15,6 +15,13 @@ logger = logging.getLogger("FederationService")
 PRODUCTS_SOURCE_PATH = "products_source.json"
 INVENTORY_SOURCE_PATH = "inventory_source.json"
 
+# --- Кеш джерел у пам'яті ---
+# Шлях до файлу -> (mtime файлу, записи як у файлі, словник записів за id);
+# файл перечитується лише після зміни
+_cache: Dict[str, Tuple[float, List[Any], Dict[int, Dict[str, Any]]]] = {}
+# Порожнє джерело (спільний об'єкт, щоб відсутній файл не спричиняв перебудову на кожен запит)
+_EMPTY_SOURCE: Dict[int, Dict[str, Any]] = {}
+
 # --- Моделі даних (Pydantic) ---
 # Модель для глобального (федеративного) представлення продукту
 class FederatedProduct(BaseModel):
@@ -26,6 +33,14 @@ class FederatedProduct(BaseModel):
     supplier: Optional[str] = None
     location: Optional[str] = None
 
+# Матеріалізоване з'єднання разом зі словниками джерел, з яких його побудовано
+class FederatedView(NamedTuple):
+    products: Optional[Dict[int, Dict[str, Any]]]
+    inventory: Optional[Dict[int, Dict[str, Any]]]
+    table: Dict[int, Optional[FederatedProduct]]
+
+_federated_view = FederatedView(products=None, inventory=None, table={})
+
 # --- Функція для створення/завантаження тестових даних ---
 def setup_mock_data():
     # Дані для products_source.json
@@ -46,13 +61,13 @@ def setup_mock_data():
     ]
 
     if not os.path.exists(PRODUCTS_SOURCE_PATH):
-        with open(PRODUCTS_SOURCE_PATH, 'w', encoding='utf-8') as f:
-            json.dump(products_data, f, indent=4, ensure_ascii=False)
+        with open(PRODUCTS_SOURCE_PATH, 'wb') as f:
+            f.write(orjson.dumps(products_data, option=orjson.OPT_INDENT_2))
         logger.info(f"Created mock data file: {PRODUCTS_SOURCE_PATH}")
 
     if not os.path.exists(INVENTORY_SOURCE_PATH):
-        with open(INVENTORY_SOURCE_PATH, 'w', encoding='utf-8') as f:
-            json.dump(inventory_data, f, indent=4, ensure_ascii=False)
+        with open(INVENTORY_SOURCE_PATH, 'wb') as f:
+            f.write(orjson.dumps(inventory_data, option=orjson.OPT_INDENT_2))
         logger.info(f"Created mock data file: {INVENTORY_SOURCE_PATH}")
 
 # --- Ініціалізація FastAPI ---
@@ -63,33 +78,82 @@ app = FastAPI(
 )
 
 # --- Логіка доступу до джерел даних ---
-def get_product_details(product_id: int) -> Optional[Dict[str, Any]]:
-    """Отримує деталі продукту з products_source.json."""
+def _load_source(path: str, key_field: str) -> Tuple[List[Any], Dict[int, Dict[str, Any]]]:
+    """
+    Повертає записи JSON-джерела у вигляді (список як у файлі, словник за ключовим полем).
+    Файл читається та розбирається лише тоді, коли змінився його mtime.
+    Записи без ключового поля не потрапляють у словник; для повторюваного ключа
+    у словнику лишається перший запис (як при лінійному пошуку), про обидва випадки
+    логується попередження.
+    Викидає FileNotFoundError / orjson.JSONDecodeError, якщо файл відсутній або пошкоджений.
+    """
+    mtime = os.stat(path).st_mtime
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1], cached[2]
+    with open(path, 'rb') as f:
+        records = orjson.loads(f.read())
+    index = {}
+    for record in records:
+        key = record.get(key_field) if isinstance(record, dict) else None
+        if key is None:
+            logger.warning(f"Skipping record without '{key_field}' in {path}: {record}")
+        elif index.setdefault(key, record) is not record:
+            logger.warning(f"Duplicate {key_field} {key} in {path}, keeping the first record")
+    _cache[path] = (mtime, records, index)
+    logger.info(f"Loaded {len(index)} records from {path}")
+    return records, index
+
+def _load(path: str, key_field: str) -> Dict[int, Dict[str, Any]]:
+    """Повертає записи JSON-джерела як словник за ключовим полем (див. _load_source)."""
+    return _load_source(path, key_field)[1]
+
+def _load_or_empty(path: str, key_field: str) -> Dict[int, Dict[str, Any]]:
+    """Як _load, але при відсутньому чи пошкодженому файлі логує помилку та повертає _EMPTY_SOURCE."""
     try:
-        with open(PRODUCTS_SOURCE_PATH, 'r', encoding='utf-8') as f:
-            products = json.load(f)
-        for p in products:
-            if p.get("product_id") == product_id:
-                return p
+        return _load(path, key_field)
     except FileNotFoundError:
-        logger.error(f"File not found: {PRODUCTS_SOURCE_PATH}")
-    except json.JSONDecodeError:
-        logger.error(f"Error decoding JSON from {PRODUCTS_SOURCE_PATH}")
-    return None
+        logger.error(f"File not found: {path}")
+    except orjson.JSONDecodeError:
+        logger.error(f"Error decoding JSON from {path}")
+    return _EMPTY_SOURCE
 
-def get_inventory_details(item_id: int) -> Optional[Dict[str, Any]]:
-    """Отримує деталі інвентарю з inventory_source.json."""
-    try:
-        with open(INVENTORY_SOURCE_PATH, 'r', encoding='utf-8') as f:
-            inventory = json.load(f)
-        for i in inventory:
-            if i.get("item_id") == item_id:
-                return i
-    except FileNotFoundError:
-        logger.error(f"File not found: {INVENTORY_SOURCE_PATH}")
-    except json.JSONDecodeError:
-        logger.error(f"Error decoding JSON from {INVENTORY_SOURCE_PATH}")
-    return None
+def get_federated_table() -> Dict[int, Optional[FederatedProduct]]:
+    """
+    Повертає матеріалізоване з'єднання products ⋈ inventory (product_id = item_id).
+    Таблиця будується хеш-з'єднанням: продукти перебираються, інвентар шукається в
+    словнику за id. Перебудова відбувається лише тоді, коли _load повернув новий
+    словник хоча б одного джерела (тобто файл змінився).
+    Значення None означає, що запис продукту не пройшов валідацію.
+    """
+    global _federated_view
+    products = _load_or_empty(PRODUCTS_SOURCE_PATH, "product_id")
+    inventory = _load_or_empty(INVENTORY_SOURCE_PATH, "item_id")
+    if _federated_view.products is products and _federated_view.inventory is inventory:
+        return _federated_view.table
+
+    table = {}
+    for product_id, product_info in products.items():
+        inventory_info = inventory.get(product_id) or {} # item_id відповідає product_id
+        # Трансформація/Комбінування даних для формування глобального представлення
+        federated_data = {
+            "id": product_id,
+            "name": product_info.get("name"),
+            "category": product_info.get("category"),
+            "price": product_info.get("base_price"),
+            "stock": inventory_info.get("stock_quantity"),
+            "supplier": inventory_info.get("supplier"),
+            "location": inventory_info.get("warehouse_location")
+        }
+        # Валідація через Pydantic модель один раз під час побудови таблиці
+        try:
+            table[product_id] = FederatedProduct(**federated_data)
+        except Exception as e: # Наприклад, pydantic.ValidationError
+            logger.error(f"Data validation error for federated product {product_id}: {e}", exc_info=True)
+            table[product_id] = None
+    _federated_view = FederatedView(products=products, inventory=inventory, table=table)
+    logger.info(f"Materialized federated view: {len(table)} products, {len(inventory)} inventory items")
+    return table
 
 # --- Ендпоінт API для федеративного запиту ---
 @app.get("/federated/products/{product_id}",
@@ -99,50 +163,22 @@ def get_inventory_details(item_id: int) -> Optional[Dict[str, Any]]:
 async def get_federated_product(product_id: int):
     """
     Отримує консолідовану (федеративну) інформацію про продукт,
-    динамічно поєднуючи дані з основного каталогу продуктів та системи інвентарю.
-    Це симулює підхід Global as View (GAV), де глобальна схема
-    (FederatedProduct) визначається на основі запитів до локальних джерел.
+    що поєднує дані з основного каталогу продуктів та системи інвентарю.
+    Глобальна схема (FederatedProduct) визначається на основі локальних джерел (GAV),
+    але з'єднання матеріалізується заздалегідь (get_federated_table), тому запит -
+    це один пошук у словнику; таблиця оновлюється при зміні файлів-джерел.
     """
     logger.info(f"Federated query received for product_id: {product_id}")
 
-    # 1. Видобування даних з першого джерела (основний каталог продуктів)
-    product_info = get_product_details(product_id)
-
-    if not product_info:
+    table = get_federated_table()
+    if product_id not in table:
         logger.warning(f"Product with id {product_id} not found in primary source.")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found in primary catalog")
 
-    # 2. Видобування даних з другого джерела (інвентар)
-    inventory_info = get_inventory_details(product_id) # item_id відповідає product_id
-
-    # 3. Трансформація/Комбінування даних для формування глобального представлення
-    # Це і є "відображення даних під час запиту" [cite: 781] (для GAV)
-    federated_data = {
-        "id": product_info["product_id"],
-        "name": product_info["name"],
-        "category": product_info["category"],
-        "price": product_info["base_price"],
-        "stock": None,
-        "supplier": None,
-        "location": None
-    }
-
-    if inventory_info:
-        logger.info(f"Inventory data found for item_id: {product_id}")
-        federated_data["stock"] = inventory_info.get("stock_quantity")
-        federated_data["supplier"] = inventory_info.get("supplier")
-        federated_data["location"] = inventory_info.get("warehouse_location")
-    else:
-        logger.info(f"No inventory data found for item_id: {product_id}. Some fields will be null.")
-
-    # Валідація через Pydantic модель перед поверненням
-    try:
-        result = FederatedProduct(**federated_data)
-        logger.info(f"Successfully federated data for product_id: {product_id}")
-        return result
-    except Exception as e: # Наприклад, pydantic.error_wrappers.ValidationError
-        logger.error(f"Data validation error for federated product {product_id}: {e}", exc_info=True)
+    result = table[product_id]
+    if result is None:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error validating federated product data")
+    return result
 
 # --- Додатковий ендпоінт для отримання всіх продуктів з основного джерела (для тестування) ---
 class ProductSourceModel(BaseModel):
@@ -155,8 +191,8 @@ class ProductSourceModel(BaseModel):
 async def get_all_source_products():
     """Повертає всі продукти з основного джерела (products_source.json)."""
     try:
-        with open(PRODUCTS_SOURCE_PATH, 'r', encoding='utf-8') as f:
-            products = json.load(f)
+        # Віддаємо записи як у файлі (з дублікатами та некоректними рядками), а не словник за id
+        products, _ = _load_source(PRODUCTS_SOURCE_PATH, "product_id")
         return [ProductSourceModel(**p) for p in products]
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"{PRODUCTS_SOURCE_PATH} not found.")
@@ -167,13 +203,19 @@ async def get_all_source_products():
 # --- Запуск сервера та налаштування даних ---
 @app.on_event("startup")
 async def startup_event():
-    """Створює тестові файли JSON при запуску, якщо вони не існують."""
+    """Створює тестові файли JSON при запуску, якщо вони не існують, та матеріалізує федеративне представлення."""
     setup_mock_data()
+    get_federated_table()
 
 # Щоб запустити цей сервер, збережіть код у файл (наприклад, lab_6.py)
 # та виконайте в терміналі команду:
 # uvicorn lab_6:app --reload
 #
+# Для продуктивного запуску (потрібні пакети uvloop та httptools):
+# uvicorn lab_6:app --workers $(nproc) --loop uvloop --http httptools --no-access-log
+# uvloop - event loop на libuv, httptools - HTTP-парсер на C, а access-лог на кожен запит вимкнено.
+# Кожен воркер - окремий процес із власним кешем джерел (він оновлюється за mtime файлів).
+#
 # Ендпоінти будуть доступні:
 # GET /federated/products/{product_id} - для отримання федеративних даних про продукт
 # GET /source/products - для перегляду даних з основного джерела